@@ -2,10 +2,22 @@
 # This file contains classes for representing a campaign.
 
 import json
-from json import JSONEncoder, JSONDecoder
+from json import JSONDecoder
+try:
+    import orjson
+except ImportError:
+    orjson = None   # stdlib json is used as the fallback
 import enum
+import itertools
+import time
 from typing import Any
-import datetime
+
+_START_TIME = time.strftime("%Y-%m-%d_%H-%M-%S")    # captured once at import, shared by every ID
+_id_counter = itertools.count()
+
+def _next_id() -> str:
+    """Returns a unique ID built from the process start time and a monotonic counter."""
+    return _START_TIME + "_" + str(next(_id_counter))
 
 class Size(enum.IntEnum):
     """Represents the size of a creature or object."""
@@ -18,41 +30,60 @@ class Size(enum.IntEnum):
 
 class World():
     """Represents a world in which a campaign takes place."""
+    __slots__ = ("name", "description", "characters", "relationships", "locations", "created_time", "_cached_json", "_rel_index", "_char_index", "_cached_basics")
+
     def __init__(self, name: str, description: str):
         self.name = name
         self.description = description
         self.characters = []
         self.relationships = []
         self.locations = []
-        self.created_time = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")   # serves as a unique ID
+        self.created_time = _next_id()   # serves as a unique ID
+        self._cached_json = None    # memoized __str__ output, cleared by the add_* methods
+        self._rel_index = {}        # maps frozenset of the two character names to their Relationship
+        self._char_index = {}       # maps character ID (created_time) to the Character
+        self._cached_basics = None  # memoized basics_as_system_msg dict
 
     def __str__(self):
-        return json.dumps(self, cls=WorldEncoder, indent=4, ensure_ascii=True)
-    
+        if(self._cached_json is None):
+            dct = self._asdict()
+            if _RAW_CAPABLE:    # embed the memoized child strings verbatim instead of re-walking them
+                dct["characters"] = [RawJSON(str(character)) for character in self.characters]
+                dct["locations"] = [RawJSON(str(location)) for location in self.locations]
+            self._cached_json = _dumps(dct)
+        return self._cached_json
+
     def __repr__(self):
-        return self.__str__()
+        return f"<World name={self.name!r}>"
     
     def add_character(self, character: "Character"):
-        assert(type(character) == Character)
+        assert isinstance(character, Character)
         self.characters.append(character)
+        self._char_index[character.created_time] = character
+        self._cached_json = None
 
     def add_relationship(self, relationship: "Relationship") -> bool:
-        assert(type(relationship) == Relationship)
-        if not relationship in self.relationships and not relationship.flipped() in self.relationships:
-            self.relationships.append(relationship)
-            return True
-        return False
+        assert isinstance(relationship, Relationship)
+        key = frozenset((relationship.characterAName, relationship.characterBName))
+        if key in self._rel_index:  # the unordered key covers both directions without building a flipped copy
+            return False
+        self._rel_index[key] = relationship
+        self.relationships.append(relationship)
+        self._cached_json = None
+        return True
 
     def add_location(self, location):
-        assert(type(location) == Location)
+        assert isinstance(location, Location)
         self.locations.append(location)
+        self._cached_json = None
 
     def get_relationship_between(self, characterA: "Character", characterB: "Character") -> "Relationship":
         """Returns the relationship between two characters, or None if no relationship exists."""
-        for relationship in self.relationships:
-            if relationship.characterAName == characterA.name and relationship.characterBName == characterB.name or relationship.characterAName == characterB.name and relationship.characterBName == characterA.name:
-                return relationship
-        return None
+        return self._rel_index.get(frozenset((characterA.name, characterB.name)))
+
+    def get_character_by_id(self, character_id: str) -> "Character":
+        """Returns the character with the given ID (created_time), or None if no such character exists."""
+        return self._char_index.get(character_id)
     
     def as_system_msg(self):
         """Returns a string representation of the world, formatted for OpenAI API system messages."""
@@ -60,49 +91,91 @@ class World():
     
     def characters_as_system_msg(self):
         """Returns a list of string representations of the Characters, formatted for OpenAI API system messages."""
-        return [character.as_system_msg() for character in self.characters]
-    
+        return [{"role": "system", "content": str(character)} for character in self.characters]
+
     def relationships_as_system_msg(self):
         """Returns a list of string representations of the Relationships, formatted for OpenAI API system messages."""
-        return [relationship.as_system_msg() for relationship in self.relationships]
-    
+        return [{"role": "system", "content": str(relationship)} for relationship in self.relationships]
+
     def locations_as_system_msg(self):
         """Returns a list of string representations of the Locations, formatted for OpenAI API system messages."""
-        return [location.as_system_msg() for location in self.locations]
+        return [{"role": "system", "content": str(location)} for location in self.locations]
     
     def world_basics(self) -> str:
         """Returns a list of string representations of the world's basic information, formatted for OpenAI API system messages."""
         return "The world is called " + self.name
+
+    def basics_as_system_msg(self):
+        """Returns a system message containing only the world's name and description.
+
+        Unlike as_system_msg, this message does not change as characters and
+        locations are added, so reusing it as the first message of every prompt
+        keeps the prefix stable and lets the API's prompt caching amortize it.
+        The memoized dict means every generator sends the identical object.
+        """
+        if(self._cached_basics is None):
+            self._cached_basics = {"role": "system", "content": "The world is called " + self.name + ". " + self.description}
+        return self._cached_basics
     
+    def _asdict(self) -> dict:
+        """Returns the world's public attributes as a dict, skipping the caches."""
+        return {"name": self.name, "description": self.description, "characters": self.characters,
+                "relationships": self.relationships, "locations": self.locations, "created_time": self.created_time}
+
     def encode(self) -> str:
         return self.__str__()
-    
+
     def decode(self, json_string: str) -> "World":
         return json.loads(json_string, cls=WorldDecoder)
 
+    @classmethod
+    def from_dict(cls, dct: dict) -> "World":
+        """Builds a World from an already-parsed dictionary, walking the nested objects directly."""
+        world = object.__new__(cls)     # skip __init__: every field comes from the dict
+        world.name = dct["name"]
+        world.description = dct["description"]
+        world.characters = [Character.from_dict(d) for d in dct.get("characters", [])]
+        world.relationships = [Relationship.from_dict(d) for d in dct.get("relationships", [])]
+        world.locations = [Location.from_dict(d) for d in dct.get("locations", [])]
+        world.created_time = dct["created_time"]
+        world._cached_json = None
+        world._rel_index = {frozenset((r.characterAName, r.characterBName)): r for r in world.relationships}
+        world._char_index = {c.created_time: c for c in world.characters}
+        world._cached_basics = None
+        return world
+
 class Location():
     """Represents a single location in a World."""
+    __slots__ = ("name", "description", "traits", "inventory", "_cached_json")
+
     def __init__(self, name: str) -> None:
         self.name = name
         self.description = ""
-        self.traits = []
+        self.traits = {}        # dictionary of trait: description
         self.inventory = []
-    
+        self._cached_json = None    # memoized __str__ output, cleared by the add_* methods
+
     def __str__(self):
-        return json.dumps(self.__dict__, cls=LocationEncoder, indent=4, ensure_ascii=True)
+        if(self._cached_json is None):
+            self._cached_json = _dumps(public_dict(self))
+        return self._cached_json
     
     def __repr__(self):
-        return self.__str__()
+        return f"<Location name={self.name!r}>"
     
     def add_trait(self, quality: str, description: str):
-        assert(type(quality) == str)
-        assert(type(description) == str)
-        self.traits.append((quality, description))
-    
+        self.traits[quality] = description
+        self._cached_json = None
+
     def add_item(self, item: "Item"):
-        assert(type(item) == Item)
+        assert isinstance(item, Item)
         self.inventory.append(item)
+        self._cached_json = None
     
+    def _asdict(self) -> dict:
+        """Returns the location's public attributes as a dict, skipping the cache."""
+        return {"name": self.name, "description": self.description, "traits": self.traits, "inventory": self.inventory}
+
     def encode(self) -> str:
         return self.__str__()
 
@@ -110,39 +183,84 @@ class Location():
         """Returns a string representation of the Location, formatted for OpenAI API system messages."""
         return {"role": "system", "content": self.__str__()}
 
+    @classmethod
+    def from_dict(cls, dct: dict) -> "Location":
+        """Builds a Location from an already-parsed dictionary."""
+        location = object.__new__(cls)  # skip __init__: every field comes from the dict
+        location.name = dct["name"]
+        location.description = dct.get("description", "")
+        traits = dct.get("traits", {})
+        location.traits = dict(traits) if isinstance(traits, list) else traits   # older saves stored a list of pairs
+        location.inventory = [Item.from_dict(d) for d in dct.get("inventory", [])]
+        location._cached_json = None
+        return location
+
 class Character():
     """Represents a single character."""
+    __slots__ = ("name", "description", "traits", "inventory", "created_time", "_cached_json", "_cached_msg")
+
     def __init__(self, name) -> None:
         self.name = name
         self.description = ""
         self.traits = {}        # dictionary of trait: description
         self.inventory = []     # list of Item objects
-        self.created_time = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")   # serves as a unique ID
-    
+        self.created_time = _next_id()   # serves as a unique ID
+        self._cached_json = None    # memoized __str__ output, cleared by the add_* methods
+        self._cached_msg = None     # memoized as_system_msg dict, rebuilt whenever __str__ changes
+
     def __str__(self):
-        return json.dumps(self.__dict__, cls=CharacterEncoder, indent=4, ensure_ascii=True)
+        if(self._cached_json is None):
+            self._cached_json = _dumps(public_dict(self))
+        return self._cached_json
     
     def __repr__(self):
-        return self.__str__()
+        return f"<Character name={self.name!r}>"
     
     def add_trait(self, quality: str, description: str):
-        assert(type(quality) == str)
-        assert(type(description) == str)
         self.traits[quality] = description
-    
+        self._cached_json = None
+
     def add_item(self, item: "Item"):
-        assert(type(item) == Item)
+        assert isinstance(item, Item)
         self.inventory.append(item)
-    
+        self._cached_json = None
+
+    def _asdict(self) -> dict:
+        """Returns the character's public attributes as a dict, skipping the cache."""
+        return {"name": self.name, "description": self.description, "traits": self.traits,
+                "inventory": self.inventory, "created_time": self.created_time}
+
     def encode(self) -> str:
         return self.__str__()
 
     def as_system_msg(self):
-        """Returns a string representation of the Character, formatted for OpenAI API system messages."""
-        return {"role": "system", "content": self.__str__()}
+        """Returns a string representation of the Character, formatted for OpenAI API system messages.
+
+        The dict is memoized so the N-squared relationship loops reuse one
+        object per character; it is rebuilt whenever the underlying JSON does.
+        """
+        content = self.__str__()
+        if(self._cached_msg is None or self._cached_msg["content"] is not content):
+            self._cached_msg = {"role": "system", "content": content}
+        return self._cached_msg
+
+    @classmethod
+    def from_dict(cls, dct: dict) -> "Character":
+        """Builds a Character from an already-parsed dictionary."""
+        character = object.__new__(cls)     # skip __init__: no wasted ID generation for a field we overwrite
+        character.name = dct["name"]
+        character.description = dct.get("description", "")
+        character.traits = dct.get("traits", {})
+        character.inventory = [Item.from_dict(d) for d in dct.get("inventory", [])]
+        character.created_time = dct["created_time"]
+        character._cached_json = None
+        character._cached_msg = None
+        return character
 
 class Relationship():
     """Represents both directions of a relationship between two characters."""
+    __slots__ = ("characterAName", "characterA_ID", "characterBName", "characterB_ID", "relateAB", "relateBA", "created_time")
+
     def __init__(self, characterA: Character, characterB: Character) -> None:
         self.characterAName = characterA.name
         self.characterA_ID = characterA.created_time
@@ -150,145 +268,151 @@ class Relationship():
         self.characterB_ID = characterB.created_time
         self.relateAB = ""
         self.relateBA = ""
-        self.created_time = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")   # serves as a unique ID
+        self.created_time = _next_id()   # serves as a unique ID
     
     def __str__(self):
-        return json.dumps(self.__dict__, default=RelationshipDecoder, indent=4, ensure_ascii=True)
+        return _dumps(public_dict(self))
     
     def __repr__(self):
-        return self.__str__()
+        return f"<Relationship {self.characterAName}<->{self.characterBName}>"
     
     def set_symmetric_relationship(self, relationship: str):
-        assert(type(relationship) == str)
         self.relateAB = relationship
         self.relateBA = relationship
     
     def set_asymmetric_relationship(self, relateAB: str, relateBA: str):
-        assert(type(relateAB) == str)
-        assert(type(relateBA) == str)
         self.relateAB = relateAB
         self.relateBA = relateBA
     
+    def _asdict(self) -> dict:
+        """Returns the relationship's attributes as a dict."""
+        return {"characterAName": self.characterAName, "characterA_ID": self.characterA_ID,
+                "characterBName": self.characterBName, "characterB_ID": self.characterB_ID,
+                "relateAB": self.relateAB, "relateBA": self.relateBA, "created_time": self.created_time}
+
     def encode(self) -> str:
         """Returns a JSON representation of the Relationship."""
         return self.__str__()
     
+    @classmethod
+    def from_dict(cls, dct: dict) -> "Relationship":
+        """Builds a Relationship from an already-parsed dictionary."""
+        relationship = object.__new__(cls)  # skip __init__: no throwaway Character objects just to carry the names
+        relationship.characterAName = dct["characterAName"]
+        relationship.characterA_ID = dct.get("characterA_ID", "")
+        relationship.characterBName = dct["characterBName"]
+        relationship.characterB_ID = dct.get("characterB_ID", "")
+        relationship.relateAB = dct["relateAB"]
+        relationship.relateBA = dct["relateBA"]
+        relationship.created_time = dct["created_time"]
+        return relationship
+
     def flipped(self) -> "Relationship":
         """Returns a new Relationship with the characters and relationships swapped."""
-        tempRelationship = Relationship(Character(self.characterBName), Character(self.characterAName))
-        tempRelationship.created_time = self.created_time
-        tempRelationship.characterA_ID, tempRelationship.characterB_ID = self.characterB_ID, self.characterA_ID
-        tempRelationship.relateAB, tempRelationship.relateBA = self.relateBA, self.relateAB
-        return tempRelationship
+        # skip __init__ so no throwaway Character objects (or fresh IDs) are allocated
+        flipped = object.__new__(Relationship)
+        flipped.characterAName = self.characterBName
+        flipped.characterA_ID = self.characterB_ID
+        flipped.characterBName = self.characterAName
+        flipped.characterB_ID = self.characterA_ID
+        flipped.relateAB = self.relateBA
+        flipped.relateBA = self.relateAB
+        flipped.created_time = self.created_time
+        return flipped
 
 class Item():
     """Represents a single item."""
+    __slots__ = ("name", "description", "traits", "size", "_cached_json")
+
     def __init__(self, name: str) -> None:
         self.name = name
         self.description = ""
         self.traits = {}        # dictionary of trait: description
         self.size = Size.MEDIUM # Size enum
-    
+        self._cached_json = None    # memoized __str__ output, cleared by add_trait
+
     def __str__(self):
-        return json.dumps(self.__dict__, cls=ItemEncoder, indent=4, ensure_ascii=True)
+        if(self._cached_json is None):
+            self._cached_json = _dumps(public_dict(self))
+        return self._cached_json
     
     def __repr__(self):
-        return self.__str__()
+        return f"<Item name={self.name!r}>"
     
     def add_trait(self, quality: str, description: str):
-        assert(type(quality) == str)
-        assert(type(description) == str)
         self.traits[quality] = description
+        self._cached_json = None
+
+    def _asdict(self) -> dict:
+        """Returns the item's public attributes as a dict, skipping the cache."""
+        return {"name": self.name, "description": self.description, "traits": self.traits, "size": self.size}
+
+    @classmethod
+    def from_dict(cls, dct: dict) -> "Item":
+        """Builds an Item from an already-parsed dictionary."""
+        item = object.__new__(cls)      # skip __init__: every field comes from the dict
+        item.name = dct["name"]
+        item.description = dct.get("description", "")
+        item.traits = dct.get("traits", {})
+        item.size = Size(dct.get("size", Size.MEDIUM))   # stored as its integer value
+        item._cached_json = None
+        return item
 
-class WorldEncoder(JSONEncoder):
-    def default(self, o):
-        return o.__dict__
+class RawJSON():
+    """Wraps an already-serialized JSON string so encoding can embed it verbatim."""
+    __slots__ = ("s",)
 
-class LocationEncoder(JSONEncoder):
-    def default(self, o):
-        return o.__dict__
+    def __init__(self, s: str):
+        self.s = s
 
-class CharacterEncoder(JSONEncoder):
-    def default(self, o: Character):
-        return o.__dict__
+# orjson grew Fragment (verbatim embedding) in 3.9; older versions fall back to re-parsing
+_RAW_CAPABLE = orjson is not None and hasattr(orjson, "Fragment")
 
-class RelationshipEncoder(JSONEncoder):
-    def default(self, o):
-        return o.__dict__
+def public_dict(o) -> dict:
+    """Returns the object's attributes without private (underscore) entries such as caches."""
+    if isinstance(o, RawJSON):
+        return _loads(o.s)  # fallback when the encoder cannot embed the string verbatim
+    return o._asdict()
 
-class ItemEncoder(JSONEncoder):
-    def default(self, o):
-        return o.__dict__
+def _encode_default(o):
+    """orjson default hook: embeds RawJSON verbatim, everything else via public_dict."""
+    if isinstance(o, RawJSON):
+        return orjson.Fragment(o.s.encode())
+    return public_dict(o)
+
+# built once so the fallback path doesn't reconstruct an encoder (and its
+# iterencode closure) on every call the way json.dumps does
+_FALLBACK_ENCODER = json.JSONEncoder(default=public_dict, indent=4)
+
+def _dumps(obj) -> str:
+    """Serializes an object to an indented JSON string, with orjson when available."""
+    if orjson is not None:
+        default = _encode_default if _RAW_CAPABLE else public_dict
+        return orjson.dumps(obj, default=default, option=orjson.OPT_INDENT_2).decode()
+    return _FALLBACK_ENCODER.encode(obj)
+
+def _loads(text):
+    """Parses a JSON string, with orjson when available."""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
 
 class WorldDecoder(JSONDecoder):
     def decode(self, o):
-        dct = json.loads(o)
-        world = World(dct["name"], dct["description"])
-        try:
-            world.characters = json.loads(dct["characters"], cls=CharacterDecoder)
-        except:
-            world.characters = []
-        try:
-            world.relationships = json.loads(dct["relationships"], cls=RelationshipDecoder)
-        except:
-            world.relationships = []
-        try:
-            world.locations = json.loads(dct["locations"], cls=LocationDecoder)
-        except:
-            world.locations = []
-        world.created_time = dct["created_time"]
-        return world
+        return World.from_dict(_loads(o))
 
 class LocationDecoder(JSONDecoder):
     def decode(self, o):
-        dct = json.loads(o)
-        location = Location(dct["name"])
-        location.description = dct["description"]
-        try:
-            location.traits = dct["traits"]
-        except:
-            location.traits = []
-        try:
-            location.inventory = json.loads(dct["inventory"], cls=ItemDecoder)
-        except:
-            location.inventory = []
-        return location
+        return Location.from_dict(_loads(o))
 
 class CharacterDecoder(JSONDecoder):
     def decode(self, o):
-        dct = json.loads(o, )
-        character = Character(dct["name"])
-        try:
-            character.traits = dct["traits"]
-        except:
-            character.traits = []
-        try:
-            character.inventory = json.loads(dct["inventory"], cls=ItemDecoder)
-        except:
-            character.inventory = []
-        character.created_time = dct["created_time"]
-        return character
+        return Character.from_dict(_loads(o))
 
 class RelationshipDecoder(JSONDecoder):
     def decode(self, o):
-        dct = json.loads(o)
-        relationship = Relationship(dct["characterAName"], dct["characterBName"])
-        relationship.relateAB = dct["relateAB"]
-        relationship.relateBA = dct["relateBA"]
-        relationship.created_time = dct["created_time"]
-        return relationship
+        return Relationship.from_dict(_loads(o))
 
 class ItemDecoder(JSONDecoder):
     def decode(self, o):
-        dct = json.loads(o)
-        item = Item(dct["name"])
-        item.description = dct["description"]
-        try:
-            item.traits = dct["traits"]
-        except:
-            item.traits = []
-        try:
-            item.size = dct["size"]
-        except:
-            item.size = Size.MEDIUM
-        return item
+        return Item.from_dict(_loads(o))
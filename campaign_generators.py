@@ -1,13 +1,23 @@
 # Scott Ratchford
 # This file contains functions for generating campaign objects through API calls.
 
+import asyncio
+import atexit
+import functools
+import httpx
+import itertools
 import openai
-import datetime
+import os
+import queue
+import threading
+import time
+import tenacity
 import tiktoken
 import campaign
 import random
-import regex as re
+import re
 import json
+import orjson
 
 # global constants for sanity checking
 MAX_LOCATIONS = 10
@@ -17,46 +27,212 @@ RELATIONSHIP_PROBABILITY = 0.3
 # global constants for generations
 RETRY_LIMIT = 3         # number of times to retry a request before giving up
 MODEL = "gpt-3.5-turbo" # AI model to use for generation
+CONCURRENT_REQUESTS = 10    # maximum number of API requests in flight at once
+MAX_COMPLETION_TOKENS = 4096    # completion-token cap for the model; batched requests clamp to this
+BATCH_POLL_INTERVAL = 30    # seconds to wait between Batch API status checks
 # global constants for logging
 LOG_COMPLETIONS = False          # whether to log AI completions
 SAVE_CREATIONS = True   # whether to save generated objects to files
 # global constants for AI parameters
 CREATIVE_TEMPERATURE = 1.3       # AI temperature
+# cost per 1000 prompt tokens, in USD
+# TODO: add more models and costs
+MODEL_COSTS = {
+    "gpt-3.5-turbo": 0.002
+}
+
+_client = None  # shared AsyncOpenAI client, created on first use
+
+# transient errors worth retrying; invalid responses and bad requests are not
+_RETRYABLE_ERRORS = (openai.RateLimitError, openai.APITimeoutError, openai.APIConnectionError)
+
+def get_client() -> openai.AsyncOpenAI:
+    """Returns the shared AsyncOpenAI client, creating it on first use.
+
+    The client is backed by a single httpx connection pool with keep-alive
+    connections, so concurrent requests reuse warm TCP/TLS connections
+    instead of paying a handshake per call.
+    """
+    global _client
+    if _client is None:
+        http_client = httpx.AsyncClient(limits=httpx.Limits(max_connections=50, max_keepalive_connections=50), timeout=60.0)
+        _client = openai.AsyncOpenAI(http_client=http_client)
+    return _client
+
+async def close_client() -> None:
+    """Closes the shared client and its connection pool, if one was created.
+
+    Call this before the event loop shuts down so keep-alive connections are
+    torn down cleanly instead of being dropped mid-close.
+    """
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+async def _create_completion(**kwargs):
+    """Issues a single chat completion request."""
+    return await get_client().chat.completions.create(**kwargs)
+
+@tenacity.retry(retry=tenacity.retry_if_exception_type(_RETRYABLE_ERRORS),
+                wait=tenacity.wait_random_exponential(min=1, max=60),
+                stop=tenacity.stop_after_attempt(5),
+                reraise=True)
+async def _stream_completion(**kwargs) -> tuple:
+    """Streams a chat completion and accumulates the reply as it arrives.
+
+    Streaming overlaps client-side work with the network transfer instead of
+    blocking until the server has buffered the full completion. The retry
+    wraps the whole consume loop, not just the opening call, so a transient
+    error mid-stream re-requests the completion with exponential backoff;
+    nothing is kept from the aborted stream, so re-consuming is safe.
+
+    Returns:
+        tuple: The reply content and its finish_reason.
+    """
+    stream = await _create_completion(stream=True, **kwargs)
+    parts = []
+    finish_reason = None
+    async for chunk in stream:
+        if(not chunk.choices):
+            continue
+        choice = chunk.choices[0]
+        if(choice.delta.content):
+            parts.append(choice.delta.content)
+        if(choice.finish_reason):
+            finish_reason = choice.finish_reason
+    return "".join(parts), finish_reason
+
+async def _chat_completion(messages: list, max_tokens: int, semaphore: asyncio.Semaphore = None) -> tuple:
+    """Issues a streamed chat completion request, bounded by the semaphore if one is given.
+
+    Args:
+        messages (list): Messages to send to the AI.
+        max_tokens (int): Maximum number of tokens in the response.
+        semaphore (asyncio.Semaphore, optional): Limits concurrent requests. Defaults to None.
+
+    Returns:
+        tuple: The reply content and its finish_reason.
+    """
+    if semaphore is None:
+        return await _stream_completion(model=MODEL, messages=messages, temperature=CREATIVE_TEMPERATURE, max_tokens=max_tokens)
+    async with semaphore:
+        return await _stream_completion(model=MODEL, messages=messages, temperature=CREATIVE_TEMPERATURE, max_tokens=max_tokens)
+
+# retries generations whose reply came back malformed (ValueError); transient
+# API errors are already retried with backoff inside _create_completion
+_retry_invalid = tenacity.retry(retry=tenacity.retry_if_exception_type(ValueError),
+                                wait=tenacity.wait_random_exponential(min=1, max=30),
+                                stop=tenacity.stop_after_attempt(RETRY_LIMIT),
+                                reraise=True)
+
+async def _try_generate(generate):
+    """Runs a generation, returning None if it still fails after its own retries.
+
+    Args:
+        generate: A no-argument callable returning a generation coroutine.
+    """
+    try:
+        return await generate()
+    except ValueError:
+        return None
+
+# compiled once at import so the cleaning pipeline does not pay the pattern
+# compile (or its cache lookup) on every response
+_DOUBLE_NL_SP = re.compile(r' \n\n')
+_DOUBLE_NL = re.compile(r'\n\n')
+_INCOMPLETE = re.compile(r'\.([^\.]*)$')
 
 def remove_non_ascii(text):
     """Removes all non-ASCII characters from a string."""
-    return re.sub(r'[^\x00-\x7F]', '', text)
+    return text.encode("ascii", "ignore").decode("ascii")
 
 def remove_double_newlines(text):
     """Removes all newline characters from a response."""
-    text = re.sub(r' \n\n', '', text)
-    return re.sub(r'\n\n', '', text)
+    text = _DOUBLE_NL_SP.sub('', text)
+    return _DOUBLE_NL.sub('', text)
 
 def remove_incomplete_sentences(text):
     """Removes all incomplete sentences from a response."""
-    return re.sub(r'\.([^\.]*)$', '', text) + "."
+    return _INCOMPLETE.sub('', text) + "."
 
 def remove_leading_whitespace(text):
     """Removes all leading whitespace from a response."""
-    return re.sub(r'^\s+', '', text)
+    return text.lstrip()
 
 def remove_whitespace(text):
     """Removes all whitespace from a response."""
-    return re.sub(r'\s+', '', text)
+    return "".join(text.split())
 
+@functools.lru_cache(maxsize=1024)
 def make_printable(text):
-    """Removes all non-printable characters from a string."""
-    return remove_leading_whitespace(remove_incomplete_sentences(remove_double_newlines(remove_non_ascii(text))))
+    """Removes all non-printable characters from a string.
+
+    The cleaning steps are fused into one body (and the result cached, since
+    retried prompts often return identical text) instead of chaining the four
+    helpers and allocating an intermediate string per hop.
+    """
+    text = text.encode("ascii", "ignore").decode("ascii")
+    text = _DOUBLE_NL.sub('', _DOUBLE_NL_SP.sub('', text))
+    text = _INCOMPLETE.sub('', text) + "."
+    return text.lstrip()
+
+_RUN_ID = time.strftime("%Y-%m-%d_%H-%M-%S")    # captured once so every record of a run lands in the same file
+_log_queue = None   # completions pending writes by the background log writer
+_log_thread = None  # the background writer, joined at exit so no record is lost
+_LOG_SENTINEL = object()    # tells the writer to drain what is left and stop
+
+def _log_writer() -> None:
+    """Drains the log queue into the completion log file on a background thread.
+
+    The file is opened once per run with a 1 MiB buffer so thousands of small
+    records amortize into a handful of sequential writes; the sentinel makes
+    the writer finish the queue and close the file before the program ends.
+    """
+    with open("./log/completions-" + _RUN_ID + ".jsonl", "a", buffering=1 << 20) as f:
+        while True:
+            record = _log_queue.get()
+            if(record is _LOG_SENTINEL):
+                return
+            f.write(orjson.dumps(record).decode() + "\n")
+
+def _stop_log_writer() -> None:
+    """Waits for the log writer to write every queued record, then stop."""
+    _log_queue.put(_LOG_SENTINEL)
+    _log_thread.join()
+
+def create_and_log(completion) -> None:
+    """Accepts a ChatCompletion object and queues it for logging.
 
-def create_and_log(completion: openai.ChatCompletion) -> None:
-    """Accepts a ChatCompletion object and logs it to a file.
+    The record is appended to a single JSONL file by a background thread, so
+    the request path only pays for a queue put instead of an open/write/close
+    per completion (and the log directory no longer grows by one file per call).
 
     Args:
-        completion (openai.ChatCompletion): AI response to a user message.
+        completion: AI response to a user message.
     """
-    time = datetime.datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-    with open("./log/" + time + "-completion.json", "w") as f:
-        f.write(str(completion))
+    global _log_queue, _log_thread
+    if(_log_queue is None):
+        os.makedirs("./log", exist_ok=True)
+        _log_queue = queue.Queue()
+        _log_thread = threading.Thread(target=_log_writer, daemon=True)
+        _log_thread.start()
+        atexit.register(_stop_log_writer)
+    _log_queue.put({"time": time.time(), "completion": str(completion)})
+
+# prompt fragments shared by every generator, composed once at import
+_ASCII_RULES = "Use only printable ASCII characters. Do not use the _ character."
+_PIPE_FORMAT = "Create your reply in the format: %s|%s. " + _ASCII_RULES
+_JSON_ARRAY_FORMAT = "Create your reply as a JSON array in the format: [{\"name\": %s, \"description\": %s}, ...]. " + _ASCII_RULES
+
+# maps each campaign type to the function naming its save file
+_SAVE_NAMERS = {
+    campaign.World: lambda o: o.name,
+    campaign.Location: lambda o: o.name,
+    campaign.Character: lambda o: o.name,
+    campaign.Item: lambda o: o.name,
+    campaign.Relationship: lambda o: o.characterAName + "-" + o.characterBName,
+}
 
 def save_campaign_object(obj: campaign.World or campaign.Location or campaign.Character or campaign.Relationship or campaign.Item) -> None:
     """Saves a campaign object to a file.
@@ -64,29 +240,23 @@ def save_campaign_object(obj: campaign.World or campaign.Location or campaign.Ch
     Args:
         obj (campaign.World or campaign.Location or campaign.Character or campaign.Relationship or campaign.Item): The object to save.
     """
-    if(type(obj) == campaign.World):
-        with open("./data/" + type(obj).__name__ + "-" + obj.name + ".json", "w") as f:
-            f.write(json.dumps(obj, indent=4, cls=campaign.WorldEncoder, ensure_ascii=True))
+    namer = _SAVE_NAMERS.get(type(obj))
+    if(namer is None):
+        with open("./data/" + type(obj).__name__ + "-" + obj.name + ".json", "wb") as f:
+            f.write(orjson.dumps(str(obj)))
         return
-    elif(type(obj) == campaign.Location):
-        with open("./data/" + type(obj).__name__ + "-" + obj.name + ".json", "w") as f:
-            f.write(json.dumps(obj, indent=4, cls=campaign.LocationEncoder, ensure_ascii=True))
-        return
-    elif(type(obj) == campaign.Character):
-        with open("./data/" + type(obj).__name__ + "-" + obj.name + ".json", "w") as f:
-            f.write(json.dumps(obj, indent=4, cls=campaign.CharacterEncoder, ensure_ascii=True))
-        return
-    elif(type(obj) == campaign.Item):
-        with open("./data/" + type(obj).__name__ + "-" + obj.name + ".json", "w") as f:
-            f.write(json.dumps(obj, indent=4, cls=campaign.ItemEncoder, ensure_ascii=True))
-        return
-    elif(type(obj) == campaign.Relationship):
-        with open("./data/" + type(obj).__name__ + "-" + obj.characterAName + "-" + obj.characterBName + ".json", "w") as f:
-            f.write(json.dumps(obj, indent=4, cls=campaign.RelationshipEncoder, ensure_ascii=True))
-        return
-    else:
-        with open("./data/" + type(obj).__name__ + "-" + obj.name + ".json", "w") as f:
-            f.write(json.dumps(str(obj)))
+    with open("./data/" + type(obj).__name__ + "-" + namer(obj) + ".json", "wb") as f:
+        f.write(orjson.dumps(obj, default=campaign.public_dict, option=orjson.OPT_INDENT_2))
+
+@functools.lru_cache(maxsize=None)
+def _encoder_for(modelName: str) -> tiktoken.Encoding:
+    """Returns the tiktoken encoder for the given model, building it only once."""
+    return tiktoken.encoding_for_model(modelName)
+
+@functools.lru_cache(maxsize=4096)
+def _token_count(prompt: str, modelName: str = MODEL) -> int:
+    """Returns the number of tokens in a prompt, caching the count for repeated prompts."""
+    return len(_encoder_for(modelName).encode(prompt))
 
 def estimate_cost(prompt: str, modelName: str, returnType: type = float) -> float or str:
     """Estimates the cost of a prompt in USD. A very rough estimate.
@@ -96,22 +266,38 @@ def estimate_cost(prompt: str, modelName: str, returnType: type = float) -> floa
         modelName (str): Model to use for cost estimation.
         returnType (type, optional): Type to return. Defaults to float.
     """
-    # per 1000 tokens
-    # TODO: add more models and costs
-    model_costs = {
-        "gpt-3.5-turbo": 0.002
-    }
-    numTokens = len(tiktoken.Encoding.encode(prompt))
+    numTokens = _token_count(prompt, modelName)
+    if(returnType == str):
+        return "$" + str(numTokens / 1000 * MODEL_COSTS[modelName])
+    else:
+        return numTokens / 1000 * MODEL_COSTS[modelName]
+
+def estimate_messages_cost(messages: list, modelName: str, returnType: type = float) -> float or str:
+    """Estimates the cost of a list of chat messages in USD. A very rough estimate.
+
+    Each message's content is tokenized separately through the cached
+    _token_count, so the static instruction fragments shared by every prompt
+    (format rules, ASCII rules) are only tokenized once per run and repeated
+    estimates only pay for the parts that actually vary.
+
+    Args:
+        messages (list): Chat messages to estimate the cost of.
+        modelName (str): Model to use for cost estimation.
+        returnType (type, optional): Type to return. Defaults to float.
+    """
+    numTokens = sum(_token_count(message["content"], modelName) for message in messages)
     if(returnType == str):
-        return "$" + str(numTokens / 1000 * model_costs[modelName])
+        return "$" + str(numTokens / 1000 * MODEL_COSTS[modelName])
     else:
-        return numTokens / 1000 * model_costs[modelName]
+        return numTokens / 1000 * MODEL_COSTS[modelName]
 
-def generate_location(world: campaign.World) -> campaign.Location:
+@_retry_invalid
+async def generate_location(world: campaign.World, semaphore: asyncio.Semaphore = None) -> campaign.Location:
     """Generates a location using the OpenAI API.
 
     Args:
         world (campaign.World): The world to add the location to.
+        semaphore (asyncio.Semaphore, optional): Limits concurrent requests. Defaults to None.
 
     Raises:
         ValueError: API response was too long.
@@ -120,30 +306,75 @@ def generate_location(world: campaign.World) -> campaign.Location:
     Returns:
         campaign.Location: The generated location.
     """
-    all_messages = world.locations_as_system_msg()  # add the world as context for the next location
+    all_messages = [world.basics_as_system_msg()]   # stable world context, kept constant so the API can cache the prompt prefix
     all_messages.append(
-        {"role": "user", "content": "Generate a location to add to the world of " + str(world.name) + ". Create your reply in the format: location_name|location_description. Use only printable ASCII characters. Do not use the _ character."}
+        {"role": "user", "content": "Generate a location to add to the world of " + str(world.name) + ". " + _PIPE_FORMAT % ("location_name", "location_description")}
     )
-    reply = openai.ChatCompletion.create(model=MODEL, messages=all_messages, temperature=CREATIVE_TEMPERATURE, max_tokens=300)
+    content, finish_reason = await _chat_completion(all_messages, max_tokens=300, semaphore=semaphore)
     if(LOG_COMPLETIONS):
-        create_and_log(reply)
-    if(reply.choices[0].finish_reason == "length"):
+        create_and_log(content)
+    if(finish_reason == "length"):
         raise ValueError("Location generation failed due to length.")
-    try:
-        message = reply.choices[0].message.content.split("|")
-        location = campaign.Location(message[0])
-        location.description = message[1]
-    except:
+    name, sep, description = content.partition("|")
+    if(not sep):
         raise ValueError("Location generation failed due to invalid response. The | character was not used.")
+    location = campaign.Location(name)
+    location.description = description
     if(SAVE_CREATIONS):
-        save_campaign_object(location)
+        await asyncio.to_thread(save_campaign_object, location)
     return location
 
-def generate_character(world: campaign.World) -> campaign.Character:
+@_retry_invalid
+async def generate_locations(world: campaign.World, count: int, semaphore: asyncio.Semaphore = None) -> list:
+    """Generates several locations with a single API call.
+
+    Requesting all locations at once avoids repeating the world context for
+    every location, cutting both prompt tokens and round trips by a factor
+    of count.
+
+    Args:
+        world (campaign.World): The world to add the locations to.
+        count (int): The number of locations to generate.
+        semaphore (asyncio.Semaphore, optional): Limits concurrent requests. Defaults to None.
+
+    Raises:
+        ValueError: API response was too long.
+        ValueError: API response was invalid.
+
+    Returns:
+        list: The generated Locations.
+    """
+    if(count <= 0):
+        return []
+    all_messages = [world.basics_as_system_msg()]   # stable world context, kept constant so the API can cache the prompt prefix
+    all_messages.append(
+        {"role": "user", "content": "Generate " + str(count) + " distinct locations to add to the world of " + str(world.name) + ". " + _JSON_ARRAY_FORMAT % ("location_name", "location_description")}
+    )
+    content, finish_reason = await _chat_completion(all_messages, max_tokens=min(300 * count, MAX_COMPLETION_TOKENS), semaphore=semaphore)
+    if(LOG_COMPLETIONS):
+        create_and_log(content)
+    if(finish_reason == "length"):
+        raise ValueError("Location generation failed due to length.")
+    try:
+        locations = []
+        for entry in json.loads(content):
+            location = campaign.Location(entry["name"])
+            location.description = entry["description"]
+            locations.append(location)
+    except (json.JSONDecodeError, KeyError, TypeError) as e:
+        raise ValueError("Location generation failed due to invalid response. The reply was not a JSON array.") from e
+    if(SAVE_CREATIONS):
+        for location in locations:
+            await asyncio.to_thread(save_campaign_object, location)
+    return locations
+
+@_retry_invalid
+async def generate_character(world: campaign.World, semaphore: asyncio.Semaphore = None) -> campaign.Character:
     """Generates a character using the OpenAI API.
 
     Args:
         world (campaign.World): The world to add the character to.
+        semaphore (asyncio.Semaphore, optional): Limits concurrent requests. Defaults to None.
 
     Raises:
         ValueError: API response was too long.
@@ -152,32 +383,117 @@ def generate_character(world: campaign.World) -> campaign.Character:
     Returns:
         campaign.Character: The generated character.
     """
-    all_messages = [world.as_system_msg()]  # add the world as context for the next character, TODO: use a shorter context
+    all_messages = [world.basics_as_system_msg()]   # stable world context, kept constant so the API can cache the prompt prefix
     all_messages.append(
-        {"role": "user", "content": "Generate a character to add to the world of " + str(world.name) + ". Create your reply in the format: character_name|character_description. Use only printable ASCII characters. Do not use the _ character."}
+        {"role": "user", "content": "Generate a character to add to the world of " + str(world.name) + ". " + _PIPE_FORMAT % ("character_name", "character_description")}
     )
-    reply = openai.ChatCompletion.create(model=MODEL, messages=all_messages, temperature=CREATIVE_TEMPERATURE, max_tokens=300)
+    content, finish_reason = await _chat_completion(all_messages, max_tokens=300, semaphore=semaphore)
     if(LOG_COMPLETIONS):
-        create_and_log(reply)
-    if(reply.choices[0].finish_reason == "length"):
+        create_and_log(content)
+    if(finish_reason == "length"):
         raise ValueError("Character generation failed due to length.")
-    try:
-        message = reply.choices[0].message.content.split("|")
-        character = campaign.Character(message[0])
-        character.description = message[1]
-    except:
+    name, sep, description = content.partition("|")
+    if(not sep):
         raise ValueError("Character generation failed due to invalid response. The | character was not used.")
+    character = campaign.Character(name)
+    character.description = description
     if(SAVE_CREATIONS):
-        save_campaign_object(character)
+        await asyncio.to_thread(save_campaign_object, character)
     return character
 
-def generate_symmetric_relationship(characterA: campaign.Character, characterB: campaign.Character) -> campaign.Relationship:
+@_retry_invalid
+async def generate_characters(world: campaign.World, count: int, semaphore: asyncio.Semaphore = None) -> list:
+    """Generates several characters with a single API call.
+
+    Args:
+        world (campaign.World): The world to add the characters to.
+        count (int): The number of characters to generate.
+        semaphore (asyncio.Semaphore, optional): Limits concurrent requests. Defaults to None.
+
+    Raises:
+        ValueError: API response was too long.
+        ValueError: API response was invalid.
+
+    Returns:
+        list: The generated Characters.
+    """
+    if(count <= 0):
+        return []
+    all_messages = [world.basics_as_system_msg()]   # stable world context, kept constant so the API can cache the prompt prefix
+    all_messages.append(
+        {"role": "user", "content": "Generate " + str(count) + " distinct characters to add to the world of " + str(world.name) + ". " + _JSON_ARRAY_FORMAT % ("character_name", "character_description")}
+    )
+    content, finish_reason = await _chat_completion(all_messages, max_tokens=min(300 * count, MAX_COMPLETION_TOKENS), semaphore=semaphore)
+    if(LOG_COMPLETIONS):
+        create_and_log(content)
+    if(finish_reason == "length"):
+        raise ValueError("Character generation failed due to length.")
+    try:
+        characters = []
+        for entry in json.loads(content):
+            character = campaign.Character(entry["name"])
+            character.description = entry["description"]
+            characters.append(character)
+    except (json.JSONDecodeError, KeyError, TypeError) as e:
+        raise ValueError("Character generation failed due to invalid response. The reply was not a JSON array.") from e
+    if(SAVE_CREATIONS):
+        for character in characters:
+            await asyncio.to_thread(save_campaign_object, character)
+    return characters
+
+@_retry_invalid
+async def generate_relationships(characterA: campaign.Character, partners: list, semaphore: asyncio.Semaphore = None) -> list:
+    """Generates symmetric relationships between a character and several partners with a single API call.
+
+    Args:
+        characterA (campaign.Character): The character all the relationships involve.
+        partners (list): The Characters to relate characterA to.
+        semaphore (asyncio.Semaphore, optional): Limits concurrent requests. Defaults to None.
+
+    Raises:
+        ValueError: If the relationship generation fails due to length or invalid response.
+
+    Returns:
+        list: The generated Relationships.
+    """
+    if(not partners):
+        return []
+    all_messages = [characterA.as_system_msg()] + [partner.as_system_msg() for partner in partners]  # add the characters as context for the relationships
+    partner_names = ", ".join(partner.name for partner in partners)
+    all_messages.append(
+        {"role": "user", "content": "Generate a relationship between " + str(characterA.name) + " and each of the following characters: " + partner_names + ". Create your reply as a JSON object mapping each character name to a relationship_description. " + _ASCII_RULES}
+    )
+    content, finish_reason = await _chat_completion(all_messages, max_tokens=min(300 * len(partners), MAX_COMPLETION_TOKENS), semaphore=semaphore)
+    if(LOG_COMPLETIONS):
+        create_and_log(content)
+    if(finish_reason == "length"):
+        raise ValueError("Relationship generation failed due to length.")
+    try:
+        partners_by_name = {partner.name: partner for partner in partners}
+        relationships = []
+        for name, description in json.loads(content).items():
+            partner = partners_by_name.get(name)
+            if(partner is None):
+                continue    # the AI related a character it was not asked about
+            relationship = campaign.Relationship(characterA, partner)
+            relationship.set_symmetric_relationship(description)
+            relationships.append(relationship)
+    except (json.JSONDecodeError, AttributeError, TypeError) as e:
+        raise ValueError("Relationship generation failed due to invalid response. The reply was not a JSON object.") from e
+    if(SAVE_CREATIONS):
+        for relationship in relationships:
+            await asyncio.to_thread(save_campaign_object, relationship)
+    return relationships
+
+@_retry_invalid
+async def generate_symmetric_relationship(characterA: campaign.Character, characterB: campaign.Character, semaphore: asyncio.Semaphore = None) -> campaign.Relationship:
     """Generates a symmetric relationship between two characters using the OpenAI API.
 
     Args:
         characterA (campaign.Character): The first character.
         characterB (campaign.Character): The second character.
-    
+        semaphore (asyncio.Semaphore, optional): Limits concurrent requests. Defaults to None.
+
     Raises:
         ValueError: If the relationship generation fails due to length or invalid response.
 
@@ -186,29 +502,27 @@ def generate_symmetric_relationship(characterA: campaign.Character, characterB:
     """
     all_messages = [characterA.as_system_msg(), characterB.as_system_msg()]  # add the characters as context for the next relationship
     all_messages.append(
-        {"role": "user", "content": "Generate a relationship between " + str(characterA.name) + " and " + str(characterB.name) + ". Create your reply in the format: relationship_description. Use only printable ASCII characters. Do not use the _ character."}
+        {"role": "user", "content": "Generate a relationship between " + str(characterA.name) + " and " + str(characterB.name) + ". Create your reply in the format: relationship_description. " + _ASCII_RULES}
     )
-    reply = openai.ChatCompletion.create(model=MODEL, messages=all_messages, temperature=CREATIVE_TEMPERATURE, max_tokens=300)
+    content, finish_reason = await _chat_completion(all_messages, max_tokens=300, semaphore=semaphore)
     if(LOG_COMPLETIONS):
-        create_and_log(reply)
-    if(reply.choices[0].finish_reason == "length"):
+        create_and_log(content)
+    if(finish_reason == "length"):
         raise ValueError("Relationship generation failed due to length.")
-    try:
-        message = reply.choices[0].message.content
-        relationship = campaign.Relationship(characterA, characterB)
-        relationship.set_symmetric_relationship(message)
-    except:
-        raise ValueError("Relationship generation failed due to invalid response.")
+    relationship = campaign.Relationship(characterA, characterB)
+    relationship.set_symmetric_relationship(content)
     if(SAVE_CREATIONS):
-        save_campaign_object(relationship)
+        await asyncio.to_thread(save_campaign_object, relationship)
     return relationship
 
-def generate_asymmetric_relationship(characterA: campaign.Character, characterB: campaign.Character) -> campaign.Relationship:
+@_retry_invalid
+async def generate_asymmetric_relationship(characterA: campaign.Character, characterB: campaign.Character, semaphore: asyncio.Semaphore = None) -> campaign.Relationship:
     """Generates an asymmetric relationship between two characters using the OpenAI API.
 
     Args:
         characterA (campaign.Character): The first character.
         characterB (campaign.Character): The second character.
+        semaphore (asyncio.Semaphore, optional): Limits concurrent requests. Defaults to None.
 
     Raises:
         ValueError: If the relationship generation fails due to length or invalid response.
@@ -218,28 +532,29 @@ def generate_asymmetric_relationship(characterA: campaign.Character, characterB:
     """
     all_messages = [characterA.as_system_msg(), characterB.as_system_msg()]  # add the characters as context for the next relationship
     all_messages.append(
-        {"role": "user", "content": "Generate a relationship between " + str(characterA.name) + " and " + str(characterB.name) + " that is the same in both directions. Create your reply in the format: relationship_description. Use only printable ASCII characters. Do not use the _ character. Limit your response to 30 words."}
+        {"role": "user", "content": "Generate a relationship between " + str(characterA.name) + " and " + str(characterB.name) + " that is the same in both directions. Create your reply in the format: relationship_description. " + _ASCII_RULES + " Limit your response to 30 words."}
     )
-    reply = openai.ChatCompletion.create(model=MODEL, messages=all_messages, temperature=CREATIVE_TEMPERATURE, max_tokens=300)
+    content, finish_reason = await _chat_completion(all_messages, max_tokens=300, semaphore=semaphore)
     if(LOG_COMPLETIONS):
-        create_and_log(reply)
-    if(reply.choices[0].finish_reason == "length"):
+        create_and_log(content)
+    if(finish_reason == "length"):
         raise ValueError("Relationship generation failed due to length.")
-    try:
-        message = reply.choices[0].message.content.split("|")
-        relationship = campaign.Relationship(characterA, characterB)
-        relationship.set_asymmetric_relationship(message[0], message[1])
-    except:
+    relateAB, sep, relateBA = content.partition("|")
+    if(not sep):
         raise ValueError("Relationship generation failed due to invalid response. The | character was not used.")
+    relationship = campaign.Relationship(characterA, characterB)
+    relationship.set_asymmetric_relationship(relateAB, relateBA)
     if(SAVE_CREATIONS):
-        save_campaign_object(relationship)
+        await asyncio.to_thread(save_campaign_object, relationship)
     return relationship
 
-def generate_item(world_basics: str, location: campaign.Location) -> campaign.Item:
+@_retry_invalid
+async def generate_item(world_basics: str, location: campaign.Location, semaphore: asyncio.Semaphore = None) -> campaign.Item:
     """Generates an item using the OpenAI API.
 
     Args:
         world_description (str): The description of the world the item is in.
+        semaphore (asyncio.Semaphore, optional): Limits concurrent requests. Defaults to None.
 
     Raises:
         ValueError: If the item generation fails due to length or invalid response.
@@ -249,25 +564,81 @@ def generate_item(world_basics: str, location: campaign.Location) -> campaign.It
     """
     all_messages = [{"role": "system", "content": world_basics + str(location)}]  # add the world as context for the next item
     all_messages.append(
-        {"role": "user", "content": "Generate an item to add to the world. Create your reply in the format: item_name|item_description. Use only printable ASCII characters. Do not use the _ character."}
+        {"role": "user", "content": "Generate an item to add to the world. " + _PIPE_FORMAT % ("item_name", "item_description")}
     )
-    reply = openai.ChatCompletion.create(model=MODEL, messages=all_messages, temperature=CREATIVE_TEMPERATURE, max_tokens=300)
+    content, finish_reason = await _chat_completion(all_messages, max_tokens=300, semaphore=semaphore)
     if(LOG_COMPLETIONS):
-        create_and_log(reply)
-    if(reply.choices[0].finish_reason == "length"):
+        create_and_log(content)
+    if(finish_reason == "length"):
         raise ValueError("Item generation failed due to length.")
-    try:
-        message = reply.choices[0].message.content.split("|")
-        item = campaign.Item(message[0])
-        item.description = message[1]
-    except:
+    name, sep, description = content.partition("|")
+    if(not sep):
         raise ValueError("Item generation failed due to invalid response. The | character was not used.")
+    item = campaign.Item(name)
+    item.description = description
     if(SAVE_CREATIONS):
-        save_campaign_object(item)
+        await asyncio.to_thread(save_campaign_object, item)
     return item
 
-def generate_world(numLocations: int = 0, numCharacters: int = 0, numItems: int = 0) -> campaign.World:
-    """Generates a world using the OpenAI API.
+def _batch_request_line(custom_id: str, messages: list, max_tokens: int) -> dict:
+    """Builds a single Batch API request line for a chat completion.
+
+    Args:
+        custom_id (str): Identifier used to match the response back to its request.
+        messages (list): Messages to send to the AI.
+        max_tokens (int): Maximum number of tokens in the response.
+
+    Returns:
+        dict: The request line, ready to be serialized as JSONL.
+    """
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {"model": MODEL, "messages": messages, "temperature": CREATIVE_TEMPERATURE, "max_tokens": max_tokens},
+    }
+
+async def _run_batch(request_lines: list) -> dict:
+    """Runs a list of request lines through the OpenAI Batch API and waits for the results.
+
+    Batched requests cost half as much as real-time requests and draw from a
+    separate rate-limit pool, at the price of completing within a 24-hour window.
+
+    Args:
+        request_lines (list): Request lines built by _batch_request_line.
+
+    Raises:
+        ValueError: If the batch does not complete successfully.
+
+    Returns:
+        dict: Maps each custom_id to the content of its reply.
+    """
+    client = get_client()
+    jsonl = "\n".join(json.dumps(line) for line in request_lines)
+    batch_file = await client.files.create(file=jsonl.encode(), purpose="batch")
+    batch = await client.batches.create(input_file_id=batch_file.id, endpoint="/v1/chat/completions", completion_window="24h")
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        await asyncio.sleep(BATCH_POLL_INTERVAL)
+        batch = await client.batches.retrieve(batch.id)
+    if(batch.status != "completed"):
+        raise ValueError("Batch " + batch.id + " finished with status " + batch.status + ".")
+    output = await client.files.content(batch.output_file_id)
+    replies = {}
+    for line in output.text.splitlines():
+        record = json.loads(line)
+        response = record.get("response")
+        if(response is None or response.get("status_code") != 200):
+            continue    # failed requests are simply skipped, like failed real-time generations
+        replies[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+    return replies
+
+async def generate_world_batch(numLocations: int = 0, numCharacters: int = 0, numItems: int = 0) -> campaign.World:
+    """Generates a world using the OpenAI Batch API for the bulk generation passes.
+
+    Characters and relationships are submitted as Batch API jobs instead of
+    real-time requests. World generation is not interactive, so trading the
+    24-hour completion window for 50% lower cost and higher throughput is a
+    good fit when building many worlds.
 
     Args:
         numLocations (int, optional): The number of Locations to generate. Defaults to 0.
@@ -275,7 +646,7 @@ def generate_world(numLocations: int = 0, numCharacters: int = 0, numItems: int
         numItems (int, optional): The number of Items to generate. Defaults to 0.
 
     Returns:
-        campaign_classes.World: The generated world.
+        campaign.World: The generated world.
     """
 
     # sanity checks to prevent excessive API calls
@@ -283,88 +654,163 @@ def generate_world(numLocations: int = 0, numCharacters: int = 0, numItems: int
         raise ValueError("numLocations must be greater than or equal to 0.")
     if(numLocations > MAX_LOCATIONS):
         raise ValueError("numLocations must be less than or equal to " + str(MAX_LOCATIONS) + ".")
-    if(numLocations < 0):
+    if(numCharacters < 0):
         raise ValueError("numCharacters must be greater than or equal to 0.")
-    if(numLocations > MAX_CHARACTERS):
+    if(numCharacters > MAX_CHARACTERS):
         raise ValueError("numCharacters must be less than or equal to " + str(MAX_CHARACTERS) + ".")
 
+    semaphore = asyncio.Semaphore(CONCURRENT_REQUESTS)  # bound concurrent requests to respect rate limits
+
+    # the world prompt must complete first because it seeds the context for everything else
     world_prompt = [
         {"role": "user", "content": "Generate a world for a 5e campaign."},
         {"role": "system", "content": "Give your reply in the format: world_name|world_description"},
-        {"role": "system", "content": "Use only printable ASCII characters. Do not use the _ character."},
+        {"role": "system", "content": _ASCII_RULES},
     ]
-    reply = openai.ChatCompletion.create(model=MODEL, messages=world_prompt, temperature=CREATIVE_TEMPERATURE, max_tokens=500)
+    content, finish_reason = await _chat_completion(world_prompt, max_tokens=500)
     if(LOG_COMPLETIONS):
-        create_and_log(reply)
-    if(reply.choices[0].finish_reason == "length"):
+        create_and_log(content)
+    if(finish_reason == "length"):
         raise ValueError("World generation failed due to length. Try again.")
-    try:
-        message = reply.choices[0].message.content.split("|")
-        world = campaign.World(remove_whitespace(message[0]), message[1])
-    except:
+    name, sep, description = content.partition("|")
+    if(not sep):
         raise ValueError("World generation failed due to invalid response. Try again.")
+    world = campaign.World(remove_whitespace(name), description)
 
-    for i in range(numLocations):
-        for j in range(RETRY_LIMIT):
-            try:
-                location = generate_location(world)
-                break
-            except ValueError as e:
-                continue
-        if(location in locals()):
-            continue
+    locations = await asyncio.gather(*[_try_generate(lambda: generate_location(world, semaphore)) for i in range(numLocations)])
+    for location in locations:
+        if(location is None):
+            continue    # if the location generation failed, skip this location
         world.add_location(location)
-    
+
+    # generate the characters as a single batch
+    character_lines = []
     for i in range(numCharacters):
-        for j in range(RETRY_LIMIT):
-            try:
-                character = generate_character(world)
-                break
-            except ValueError as e:
-                continue
-        if(character in locals()):
+        character_messages = [world.basics_as_system_msg()]
+        character_messages.append(
+            {"role": "user", "content": "Generate a character to add to the world of " + str(world.name) + ". " + _PIPE_FORMAT % ("character_name", "character_description")}
+        )
+        character_lines.append(_batch_request_line("char_" + str(i), character_messages, max_tokens=300))
+    if(character_lines):
+        for content in (await _run_batch(character_lines)).values():
+            name, sep, description = content.partition("|")
+            if(not sep):
+                continue    # if the character generation failed, skip this character
+            character = campaign.Character(name)
+            character.description = description
+            if(SAVE_CREATIONS):
+                await asyncio.to_thread(save_campaign_object, character)
+            world.add_character(character)
+
+    # pick the character pairs to relate upfront, then generate them as a single batch;
+    # combinations enumerates each unordered pair exactly once, so no dedup set is needed
+    pairs = {}
+    for i, (characterA, characterB) in enumerate(itertools.combinations(world.characters, 2)):
+        if(world.get_relationship_between(characterA, characterB) != None):   # don't generate relationships between characters that already have a relationship
             continue
+        if(random.random() < RELATIONSHIP_PROBABILITY):   # generate a relationship between the two characters only if the random number is less than the probability
+            pairs["rel_" + str(i)] = (characterA, characterB)
+    relationship_lines = []
+    for custom_id, (characterA, characterB) in pairs.items():
+        relationship_messages = [characterA.as_system_msg(), characterB.as_system_msg()]
+        relationship_messages.append(
+            {"role": "user", "content": "Generate a relationship between " + str(characterA.name) + " and " + str(characterB.name) + ". Create your reply in the format: relationship_description. " + _ASCII_RULES}
+        )
+        relationship_lines.append(_batch_request_line(custom_id, relationship_messages, max_tokens=300))
+    if(relationship_lines):
+        for custom_id, content in (await _run_batch(relationship_lines)).items():
+            characterA, characterB = pairs[custom_id]
+            relationship = campaign.Relationship(characterA, characterB)
+            relationship.set_symmetric_relationship(content)
+            if(SAVE_CREATIONS):
+                await asyncio.to_thread(save_campaign_object, relationship)
+            world.add_relationship(relationship)    # add the relationship to the world
+
+    item_locations = [random.choice(world.locations) for i in range(numItems)] if world.locations else []    # nowhere to put items if every location failed
+    items = await asyncio.gather(*[_try_generate(lambda loc=loc: generate_item(world.world_basics(), loc, semaphore)) for loc in item_locations])
+    for location, item in zip(item_locations, items):
+        if(item is None):
+            continue    # if the item generation failed, skip this item
+        location.add_item(item)
+
+    if(SAVE_CREATIONS):
+        await asyncio.to_thread(save_campaign_object, world)
+    return world
+
+async def generate_world(numLocations: int = 0, numCharacters: int = 0, numItems: int = 0) -> campaign.World:
+    """Generates a world using the OpenAI API.
+
+    Independent generations are issued concurrently, so the wall time for each
+    stage is roughly one round trip instead of one per object.
+
+    Args:
+        numLocations (int, optional): The number of Locations to generate. Defaults to 0.
+        numCharacters (int, optional): The number of Characters to generate. Defaults to 0.
+        numItems (int, optional): The number of Items to generate. Defaults to 0.
+
+    Returns:
+        campaign.World: The generated world.
+    """
+
+    # sanity checks to prevent excessive API calls
+    if(numLocations < 0):
+        raise ValueError("numLocations must be greater than or equal to 0.")
+    if(numLocations > MAX_LOCATIONS):
+        raise ValueError("numLocations must be less than or equal to " + str(MAX_LOCATIONS) + ".")
+    if(numCharacters < 0):
+        raise ValueError("numCharacters must be greater than or equal to 0.")
+    if(numCharacters > MAX_CHARACTERS):
+        raise ValueError("numCharacters must be less than or equal to " + str(MAX_CHARACTERS) + ".")
+
+    semaphore = asyncio.Semaphore(CONCURRENT_REQUESTS)  # bound concurrent requests to respect rate limits
+
+    # the world prompt must complete first because it seeds the context for everything else
+    world_prompt = [
+        {"role": "user", "content": "Generate a world for a 5e campaign."},
+        {"role": "system", "content": "Give your reply in the format: world_name|world_description"},
+        {"role": "system", "content": _ASCII_RULES},
+    ]
+    content, finish_reason = await _chat_completion(world_prompt, max_tokens=500)
+    if(LOG_COMPLETIONS):
+        create_and_log(content)
+    if(finish_reason == "length"):
+        raise ValueError("World generation failed due to length. Try again.")
+    name, sep, description = content.partition("|")
+    if(not sep):
+        raise ValueError("World generation failed due to invalid response. Try again.")
+    world = campaign.World(remove_whitespace(name), description)
+
+    # one call per stage: all locations in a single request, then all characters
+    locations = await _try_generate(lambda: generate_locations(world, numLocations, semaphore))
+    for location in locations or []:
+        world.add_location(location)
+
+    characters = await _try_generate(lambda: generate_characters(world, numCharacters, semaphore))
+    for character in characters or []:
         world.add_character(character)
-    
-    for characterA in world.characters:
-        for characterB in world.characters:
-            if(characterA == characterB):   # don't generate relationships between the same character
-                continue
-            if(world.get_relationship_between(characterA, characterB) != None):   # don't generate relationships between characters that already have a relationship
-                continue
-            if(random.random() < RELATIONSHIP_PROBABILITY):   # generate a relationship between the two characters only if the random number is less than the probability
-                if(random.random() < 0.25):
-                    # asymmetric relationship
-                    for j in range(RETRY_LIMIT):
-                        try:
-                            relationship = generate_asymmetric_relationship(characterA, characterB)
-                            break
-                        except ValueError as e:
-                            continue
-                else:
-                    # symmetric relationship
-                    for j in range(RETRY_LIMIT):
-                        try:
-                            relationship = generate_symmetric_relationship(characterA, characterB)
-                            break
-                        except ValueError as e:
-                            continue
-                if(relationship in locals()):
-                    continue
-                world.add_relationship(relationship)    # add the relationship to the world
-
-    for i in range(numItems):
-        location = random.choice(world.locations)
-        for j in range(RETRY_LIMIT):
-            try:
-                item = generate_item(world.world_basics(), location)
-                break
-            except ValueError as e:
-                continue
-        if(item in locals()):
+
+    # pick the character pairs to relate upfront and group them by first character,
+    # so each character's relationships are generated with one concurrent call;
+    # combinations enumerates each unordered pair exactly once, so no dedup set is needed
+    partner_groups = {}     # maps a character's name to (character, list of partners)
+    for characterA, characterB in itertools.combinations(world.characters, 2):
+        if(world.get_relationship_between(characterA, characterB) != None):   # don't generate relationships between characters that already have a relationship
+            continue
+        if(random.random() < RELATIONSHIP_PROBABILITY):   # generate a relationship between the two characters only if the random number is less than the probability
+            partner_groups.setdefault(characterA.name, (characterA, []))[1].append(characterB)
+
+    relationship_groups = await asyncio.gather(*[_try_generate(lambda a=characterA, ps=partners: generate_relationships(a, ps, semaphore)) for characterA, partners in partner_groups.values()])
+    for relationships in relationship_groups:
+        for relationship in relationships or []:
+            world.add_relationship(relationship)    # add the relationship to the world
+
+    item_locations = [random.choice(world.locations) for i in range(numItems)] if world.locations else []    # nowhere to put items if every location failed
+    items = await asyncio.gather(*[_try_generate(lambda loc=loc: generate_item(world.world_basics(), loc, semaphore)) for loc in item_locations])
+    for location, item in zip(item_locations, items):
+        if(item is None):
             continue    # if the item generation failed, skip this item
         location.add_item(item)
 
     if(SAVE_CREATIONS):
-        save_campaign_object(world)
+        await asyncio.to_thread(save_campaign_object, world)
     return world
@@ -1,13 +1,12 @@
 # Scott Ratchford
 # This file contains examples of how to use the OpenAI API.
 
+import asyncio
 import os
 import shutil
 import openai
-import datetime
-import tiktoken
 import campaign
-import json
+import orjson
 import random
 import campaign_generators as gen
 
@@ -15,35 +14,41 @@ def log_data():
     """Moves all files from the 'data' folder to a new folder inside the 'examples' folder.
     """
 
-    # Find the World name to create a folder with that name
+    # Walk the 'data' folder once, finding the World name along the way
     world_name = None
-    for filename in os.listdir("data"):
-        if filename.startswith('World-') and filename.endswith('.json'):
-            world_name = filename[6:-5]
-            # print("World name: " + world_name)  # debug
-            break
+    entries = []
+    with os.scandir("data") as it:
+        for entry in it:
+            entries.append(entry.path)
+            if world_name is None and entry.name.startswith('World-') and entry.name.endswith('.json'):
+                world_name = entry.name[6:-5]
+                # print("World name: " + world_name)  # debug
 
     # Create the 'CURRENT' folder inside the 'examples' folder
     world_dir = os.path.join("worlds", world_name)
-    os.mkdir(world_dir)
-    
+    os.makedirs(world_dir, exist_ok=True)
+
     # Move all files from the 'data' folder to the 'CURRENT' folder
-    for filename in os.listdir("data"):
-        source = os.path.join("data", filename)
-        destination = os.path.join(world_dir, filename)
+    for source in entries:
+        destination = os.path.join(world_dir, os.path.basename(source))
         shutil.move(source, destination)
 
+async def main() -> campaign.World:
+    """Generates a world, closing the shared API client before the loop exits."""
+    try:
+        return await gen.generate_world(numLocations=5, numCharacters=10, numItems=5)
+    finally:
+        await gen.close_client()
+
 if __name__ == "__main__":
     print("Beginning program.") # debug
-    random.seed(str(datetime.datetime.now()))   # seed the random number generator
+    random.seed()   # seed the random number generator from OS entropy
     openai.api_key = os.getenv("OPENAI_API_KEY")
-    model = "gpt-3.5-turbo"
-    encoding = tiktoken.get_encoding("cl100k_base")
 
-    world = gen.generate_world(numLocations=5, numCharacters=15, numItems=5)
+    world = asyncio.run(main())
     print("Reply received.")
-    pretty_world = json.dumps(world, indent=4, cls=campaign.WorldEncoder, ensure_ascii=True)
-    with open("./completed/" + world.name + "World-" + world.name + ".json", "w") as f:
+    pretty_world = orjson.dumps(world, default=campaign.public_dict, option=orjson.OPT_INDENT_2)
+    with open("./completed/" + world.name + "World-" + world.name + ".json", "wb") as f:
         f.write(pretty_world)
 
     print("Cleaning up...") # debug